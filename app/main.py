@@ -15,11 +15,15 @@
 
 """FastAPI backend for training recommendation agent with automatic welcome message."""
 
+import asyncio
+import functools
 import logging
 import os
+import re
 import sys
 import uuid
 from pathlib import Path
+from typing import NamedTuple, Optional
 
 # 配置日志（需要在加载 .env 之前）
 logging.basicConfig(level=logging.INFO)
@@ -31,19 +35,25 @@ if str(project_root) not in sys.path:
     sys.path.insert(0, str(project_root))
 
 # 在导入 agent 之前，先加载 .env 文件
-from dotenv import load_dotenv
+from dotenv import dotenv_values
 
-# 加载项目根目录下的 .env 文件
+# 加载项目根目录下的 .env 文件（只做一次 stat 和一次解析，已存在的环境变量优先）
 env_path = project_root / ".env"
-if env_path.exists():
-    load_dotenv(env_path)
+env_found = env_path.is_file()
+_DOTENV = dotenv_values(env_path) if env_found else {}
+for key, value in _DOTENV.items():
+    if value is not None:
+        os.environ.setdefault(key, value)
+
+if env_found:
     logger.info(f"✅ 已加载环境变量文件: {env_path}")
     # 显示已加载的环境变量（不显示敏感信息）
-    if "GOOGLE_GENAI_USE_VERTEXAI" in os.environ:
-        logger.info(f"   GOOGLE_GENAI_USE_VERTEXAI={os.environ.get('GOOGLE_GENAI_USE_VERTEXAI')}")
-    if "GOOGLE_API_KEY" in os.environ:
-        api_key = os.environ.get("GOOGLE_API_KEY", "")
-        logger.info(f"   GOOGLE_API_KEY={'*' * (len(api_key) - 4) + api_key[-4:] if len(api_key) > 4 else '***'}")
+    if logger.isEnabledFor(logging.DEBUG):
+        if "GOOGLE_GENAI_USE_VERTEXAI" in os.environ:
+            logger.debug(f"   GOOGLE_GENAI_USE_VERTEXAI={os.environ.get('GOOGLE_GENAI_USE_VERTEXAI')}")
+        if "GOOGLE_API_KEY" in os.environ:
+            api_key = os.environ.get("GOOGLE_API_KEY", "")
+            logger.debug(f"   GOOGLE_API_KEY={'*' * (len(api_key) - 4) + api_key[-4:] if len(api_key) > 4 else '***'}")
 else:
     logger.warning(f"⚠️  未找到 .env 文件: {env_path}，将使用默认值或系统环境变量")
 
@@ -54,12 +64,18 @@ if "GOOGLE_GENAI_USE_VERTEXAI" not in os.environ:
     logger.info("ℹ️  使用默认值: GOOGLE_GENAI_USE_VERTEXAI=0 (AI Studio 模式)")
 
 from fastapi import FastAPI, HTTPException, Request
-from fastapi.responses import HTMLResponse, StreamingResponse, JSONResponse
+from fastapi.responses import HTMLResponse, StreamingResponse, Response
 from fastapi.staticfiles import StaticFiles
+from google.adk.events import Event
 from google.adk.runners import InMemoryRunner
 from google.genai import types
 from training_recommend import agent
-import googlemaps
+from training_recommend.prompts import WELCOME_TEXT
+from training_recommend.schemas import TrainingPlan
+from pydantic import ValidationError
+import httpx
+import orjson
+from cachetools import TTLCache
 
 app = FastAPI(title="Training Recommendation Agent")
 
@@ -73,6 +89,244 @@ if static_dir.exists():
 APP_NAME = os.getenv("APP_NAME", "training_recommend_app")
 runner = InMemoryRunner(app_name=APP_NAME, agent=agent.root_agent)
 
+# Shared async client for Google Maps web services (connection pooling + HTTP/2),
+# so geocoding requests never block the event loop
+GMAPS_CLIENT = httpx.AsyncClient(
+    base_url="https://maps.googleapis.com",
+    http2=True,
+    timeout=5.0,
+    limits=httpx.Limits(max_keepalive_connections=32),
+)
+
+# Reverse geocoding results keyed by (lat, lng) quantized to 4 decimals (~11 m)
+_GEO_CACHE = TTLCache(maxsize=8192, ttl=86400)
+
+# Geocoding address component type -> key in the /api/geocode "address" dict
+_TYPE_TO_KEY = {
+    "locality": "city",  # 城市
+    "administrative_area_level_1": "province",  # 省/州
+    "administrative_area_level_2": "district",  # 区/县
+    "country": "country",  # 国家
+    "street_address": "street",  # 街道
+    "route": "street",
+}
+_ADDRESS_KEY_COUNT = len(set(_TYPE_TO_KEY.values()))
+
+
+@app.on_event("shutdown")
+async def close_gmaps_client():
+    """Close the shared Google Maps HTTP client."""
+    await GMAPS_CLIENT.aclose()
+
+
+# Pool of pre-created sessions, so /api/create_session does not wait on the session service
+SESSION_POOL: asyncio.Queue = asyncio.Queue(maxsize=8)
+
+
+async def _new_session():
+    """Create a session for a new anonymous user."""
+    user_id = f"user_{uuid.uuid4().hex[:8]}"
+    return await runner.session_service.create_session(
+        app_name=APP_NAME, user_id=user_id
+    )
+
+
+async def warm_sessions():
+    """Keep SESSION_POOL filled with ready-to-use sessions."""
+    while True:
+        try:
+            session = await _new_session()
+        except Exception as e:
+            logger.warning(f"⚠️  Failed to pre-create session: {e}")
+            await asyncio.sleep(1)
+            continue
+        if session:
+            await SESSION_POOL.put(session)
+
+
+@app.on_event("startup")
+async def start_session_warmer():
+    """Start filling the session pool in the background."""
+    app.state.session_warmer = asyncio.create_task(warm_sessions())
+
+
+@app.on_event("shutdown")
+async def stop_session_warmer():
+    """Stop the session pool background task."""
+    app.state.session_warmer.cancel()
+
+
+class _FinalResponse(NamedTuple):
+    """Marker emitted by _agent_stream() after a final response, carrying that event's text.
+
+    Only the final event's text can hold the training plan; earlier events in the same
+    invocation (e.g. the summary before the tool calls) are streamed but not validated.
+    """
+
+    text: str
+
+# Headers for SSE responses: disable proxy buffering and caching so coalesced frames go out promptly
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+# SSE frames are yielded as pre-encoded bytes so Starlette does not re-encode each chunk
+DONE_FRAME = b"data: [DONE]\n\n"
+
+# Fixed frames of the 403 PERMISSION_DENIED error reply (the error message goes after the header)
+PERMISSION_DENIED_HEADER = "data: ⚠️ API Key 配置错误：\n\n".encode("utf-8")
+PERMISSION_DENIED_FRAMES = tuple(
+    f"data: {line}\n\n".encode("utf-8")
+    for line in (
+        "",
+        "请检查：",
+        "1. 访问 https://console.cloud.google.com/apis/credentials 检查 API Key 状态",
+        "2. 访问 https://aistudio.google.com/apikey 创建新的 API Key",
+        "3. 确保在 .env 文件中正确配置了 GOOGLE_API_KEY",
+        "4. 确保启用了 Generative Language API",
+    )
+)
+
+# The welcome reply is a fixed template, so it is served without calling the model
+WELCOME_FRAMES = b"data: " + WELCOME_TEXT.encode("utf-8") + b"\n\n" + DONE_FRAME
+
+
+# Strong references to fire-and-forget tasks, so they are not garbage collected early
+_background_tasks = set()
+
+
+async def _seed_session_with_welcome(session):
+    """Record the WELCOME exchange in the session history without calling the model."""
+    invocation_id = f"e-{uuid.uuid4()}"
+    await runner.session_service.append_event(
+        session,
+        Event(
+            invocation_id=invocation_id,
+            author="user",
+            content=types.Content(parts=[types.Part.from_text(text="WELCOME")], role="user"),
+        ),
+    )
+    await runner.session_service.append_event(
+        session,
+        Event(
+            invocation_id=invocation_id,
+            author=agent.root_agent.name,
+            content=types.Content(parts=[types.Part.from_text(text=WELCOME_TEXT)], role="model"),
+        ),
+    )
+
+
+def _log_seed_failure(session_id: str, task: asyncio.Task) -> None:
+    """Log a failed welcome-history write, which would leave the session without WELCOME."""
+    if task.cancelled():
+        return
+    e = task.exception()
+    if e is not None:
+        logger.warning(f"⚠️  Failed to seed welcome history for session {session_id}: {e}")
+
+
+# Markdown code fence around the plan JSON, tolerated the same way as the frontend does
+_JSON_FENCE_RE = re.compile(r"```(?:json)?\s*([\s\S]*?)```")
+
+
+def _extract_plan_json(text: str) -> Optional[str]:
+    """Extract the training plan JSON from a final reply that may have prose or a code fence."""
+    if '"training_plan"' not in text:
+        return None
+    match = _JSON_FENCE_RE.search(text)
+    if match:
+        text = match.group(1)
+    start = text.find("{")
+    end = text.rfind("}")
+    if start == -1 or end < start:
+        return None
+    return text[start:end + 1]
+
+
+def _check_training_plan(reply: str) -> None:
+    """Validate a final reply that contains a training plan and log the result.
+
+    Validation only feeds the logs, so it never raises into the response stream.
+    """
+    plan_json = _extract_plan_json(reply)
+    if plan_json is None:
+        return
+    try:
+        plan = TrainingPlan.model_validate_json(plan_json)
+    except ValidationError as e:
+        logger.warning(f"⚠️  Training plan JSON did not validate: {e.error_count()} error(s)")
+        return
+    except Exception as e:
+        logger.warning(f"⚠️  Training plan validation failed: {e}")
+        return
+    logger.info(f"✅ Training plan validated: {len(plan.training_plan)} days")
+
+
+async def _agent_stream(user_id: str, session_id: str, new_message: types.Content):
+    """Yield the agent's text parts, plus a _FinalResponse after each final response."""
+    async for event in runner.run_async(
+        user_id=user_id, session_id=session_id, new_message=new_message
+    ):
+        if event.content and event.content.parts:
+            for part in event.content.parts:
+                if part.text:
+                    yield part.text
+        if event.is_final_response():
+            parts = event.content.parts if event.content and event.content.parts else ()
+            yield _FinalResponse("".join(part.text for part in parts if part.text))
+
+
+async def coalesce(agen, max_bytes: int = 4096, max_delay_ms: int = 10):
+    """Merge adjacent text chunks from an async generator into larger UTF-8 chunks.
+
+    Text is buffered until it reaches ``max_bytes`` or no new chunk arrives within
+    ``max_delay_ms``, then yielded as ``bytes``. Non-text items flush the buffer and
+    are passed through as-is.
+    The source generator is consumed by a single producer task feeding an
+    ``asyncio.Queue``; exceptions it raises are re-raised after the buffer is flushed.
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+    end = object()
+    failure = []
+
+    async def produce():
+        try:
+            async for item in agen:
+                await queue.put(item)
+        except Exception as e:
+            failure.append(e)
+        finally:
+            await queue.put(end)
+
+    producer = asyncio.create_task(produce())
+    buf = bytearray()
+    timeout = max_delay_ms / 1000
+    try:
+        while True:
+            try:
+                item = await asyncio.wait_for(queue.get(), timeout) if buf else await queue.get()
+            except asyncio.TimeoutError:
+                yield bytes(buf)
+                buf.clear()
+                continue
+
+            if isinstance(item, str):
+                buf += item.encode("utf-8")
+                if len(buf) >= max_bytes:
+                    yield bytes(buf)
+                    buf.clear()
+                continue
+
+            if buf:
+                yield bytes(buf)
+                buf.clear()
+            if item is end:
+                break
+            yield item
+
+        if failure:
+            raise failure[0]
+    finally:
+        producer.cancel()
+
 
 @app.get("/", response_class=HTMLResponse)
 async def read_root():
@@ -88,38 +342,31 @@ async def create_session():
     """
     创建会话并自动发送欢迎消息
     
-    这是实现自动欢迎消息的核心：在会话创建时，自动发送 "WELCOME" 消息给 Agent，
-    Agent 检测到这个消息后会立即回复欢迎信息。
+    欢迎消息是固定模板（欢迎语 + 第一个问题），因此直接返回，不再调用模型；
+    同时把 "WELCOME" 及其回复写入会话历史，使后续对话上下文与调用模型时一致。
     """
-    user_id = f"user_{uuid.uuid4().hex[:8]}"
-    session = await runner.session_service.create_session(
-        app_name=APP_NAME, user_id=user_id
-    )
+    # 优先使用预先创建的会话，池为空时再同步创建
+    try:
+        session = SESSION_POOL.get_nowait()
+    except asyncio.QueueEmpty:
+        session = await _new_session()
 
     if not session:
         raise HTTPException(status_code=500, detail="Failed to create session")
 
-    # 自动发送欢迎消息（相当于 Dialogflow CX 的 EventInput）
-    welcome_message = types.Content(
-        parts=[types.Part.from_text(text="WELCOME")], role="user"
-    )
+    user_id = session.user_id
 
-    # 流式返回欢迎消息的回复
-    async def generate_welcome():
-        async for event in runner.run_async(
-            user_id=user_id, session_id=session.id, new_message=welcome_message
-        ):
-            if event.content and event.content.parts:
-                for part in event.content.parts:
-                    if part.text:
-                        yield f"data: {part.text}\n\n"
-            if event.is_final_response():
-                yield "data: [DONE]\n\n"
+    # 会话历史在后台写入，响应不必等待
+    task = asyncio.create_task(_seed_session_with_welcome(session))
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    task.add_done_callback(functools.partial(_log_seed_failure, session.id))
 
-    return StreamingResponse(
-        generate_welcome(),
+    return Response(
+        content=WELCOME_FRAMES,
         media_type="text/event-stream",
         headers={
+            **SSE_HEADERS,
             "X-User-Id": user_id,
             "X-Session-Id": session.id,
         },
@@ -147,12 +394,30 @@ async def geocode(lat: float, lng: float):
             detail="Google Maps API key not configured"
         )
     
+    # 附近的坐标通常对应同一地址，命中缓存时直接返回，不再调用 Maps API
+    cache_key = (round(lat, 4), round(lng, 4))
+    cached = _GEO_CACHE.get(cache_key)
+    if cached is not None:
+        return Response(
+            orjson.dumps({**cached, "latitude": lat, "longitude": lng}),
+            media_type="application/json",
+        )
+    
     try:
-        gmaps = googlemaps.Client(key=maps_api_key)
-        
         # 反向地理编码：将经纬度转换为地址
         # 指定语言为中文，确保返回中文地址
-        reverse_geocode_result = gmaps.reverse_geocode((lat, lng), language='zh-CN')
+        response = await GMAPS_CLIENT.get(
+            "/maps/api/geocode/json",
+            params={"latlng": f"{lat},{lng}", "language": "zh-CN", "key": maps_api_key},
+        )
+        response.raise_for_status()
+        data = response.json()
+        
+        status = data.get("status", "")
+        if status not in ("OK", "ZERO_RESULTS"):
+            raise RuntimeError(f"{status}: {data.get('error_message', '')}")
+        
+        reverse_geocode_result = data.get("results", [])
         
         if not reverse_geocode_result:
             raise HTTPException(
@@ -167,19 +432,13 @@ async def geocode(lat: float, lng: float):
         # 提取地址组件
         address_components = {}
         for component in result.get("address_components", []):
-            types_list = component.get("types", [])
-            long_name = component.get("long_name", "")
-            
-            if "locality" in types_list:  # 城市
-                address_components["city"] = long_name
-            elif "administrative_area_level_1" in types_list:  # 省/州
-                address_components["province"] = long_name
-            elif "administrative_area_level_2" in types_list:  # 区/县
-                address_components["district"] = long_name
-            elif "country" in types_list:  # 国家
-                address_components["country"] = long_name
-            elif "street_address" in types_list or "route" in types_list:  # 街道
-                address_components["street"] = long_name
+            for component_type in component.get("types", ()):
+                key = _TYPE_TO_KEY.get(component_type)
+                if key:
+                    address_components[key] = component.get("long_name", "")
+                    break
+            if len(address_components) == _ADDRESS_KEY_COUNT:
+                break  # 所有字段都已填充
         
         # 确定城市名称（优先使用 locality，否则使用 administrative_area_level_1）
         city = (
@@ -189,13 +448,17 @@ async def geocode(lat: float, lng: float):
             "未知城市"
         )
         
-        return JSONResponse({
+        geocoded = {
             "city": city,
             "formatted_address": formatted_address,
             "address": address_components,
-            "latitude": lat,
-            "longitude": lng
-        })
+        }
+        _GEO_CACHE[cache_key] = geocoded
+        
+        return Response(
+            orjson.dumps({**geocoded, "latitude": lat, "longitude": lng}),
+            media_type="application/json",
+        )
         
     except Exception as e:
         logger.error(f"❌ Geocoding error: {e}")
@@ -221,36 +484,40 @@ async def send_message(request: Request):
 
     async def generate_response():
         try:
-            async for event in runner.run_async(
-                user_id=user_id, session_id=session_id, new_message=content
-            ):
-                if event.content and event.content.parts:
-                    for part in event.content.parts:
-                        if part.text:
-                            yield f"data: {part.text}\n\n"
-                if event.is_final_response():
-                    yield "data: [DONE]\n\n"
+            async for chunk in coalesce(_agent_stream(user_id, session_id, content)):
+                if isinstance(chunk, _FinalResponse):
+                    # 先发送 [DONE]，校验只用于日志，不推迟客户端收尾
+                    yield DONE_FRAME
+                    _check_training_plan(chunk.text)
+                else:
+                    yield b"data: " + chunk + b"\n\n"
         except Exception as e:
             error_msg = str(e)
             if "403" in error_msg and "PERMISSION_DENIED" in error_msg:
-                yield f"data: ⚠️ API Key 配置错误：\n\n"
-                yield f"data: 错误信息：{error_msg}\n\n"
-                yield f"data: \n\n"
-                yield f"data: 请检查：\n\n"
-                yield f"data: 1. 访问 https://console.cloud.google.com/apis/credentials 检查 API Key 状态\n\n"
-                yield f"data: 2. 访问 https://aistudio.google.com/apikey 创建新的 API Key\n\n"
-                yield f"data: 3. 确保在 .env 文件中正确配置了 GOOGLE_API_KEY\n\n"
-                yield f"data: 4. 确保启用了 Generative Language API\n\n"
+                yield PERMISSION_DENIED_HEADER
+                yield f"data: 错误信息：{error_msg}\n\n".encode("utf-8")
+                for frame in PERMISSION_DENIED_FRAMES:
+                    yield frame
             else:
-                yield f"data: 抱歉，处理消息时出现错误：{error_msg}\n\n"
-            yield "data: [DONE]\n\n"
+                yield f"data: 抱歉，处理消息时出现错误：{error_msg}\n\n".encode("utf-8")
+            yield DONE_FRAME
 
     return StreamingResponse(
-        generate_response(), media_type="text/event-stream"
+        generate_response(), media_type="text/event-stream", headers=SSE_HEADERS
     )
 
 
 if __name__ == "__main__":
     import uvicorn
 
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # uvloop + httptools cut per-iteration event loop and HTTP parsing overhead.
+    # 会话保存在 InMemoryRunner 的进程内存中，只能单进程运行，因此直接传入 app 对象
+    uvicorn.run(
+        app,
+        host="0.0.0.0",
+        port=8000,
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools",
+        timeout_keep_alive=75,
+        backlog=2048,
+    )
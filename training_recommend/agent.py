@@ -20,6 +20,7 @@ from google.adk import Agent
 from .config import Config
 from .prompts import GLOBAL_INSTRUCTION, INSTRUCTION
 from .tools import get_weather_forecast, search_nearby_venues, get_recommended_gear
+from .tools._async import concurrent_tool
 
 warnings.filterwarnings("ignore", category=UserWarning, module=".*pydantic.*")
 
@@ -34,9 +35,10 @@ root_agent = Agent(
     global_instruction=GLOBAL_INSTRUCTION,
     instruction=INSTRUCTION,
     name=configs.agent_settings.name,
+    # Tools run in worker threads so parallel calls in one turn overlap
     tools=[
-        get_weather_forecast,
-        search_nearby_venues,
-        get_recommended_gear,
+        concurrent_tool(get_weather_forecast),
+        concurrent_tool(search_nearby_venues),
+        concurrent_tool(get_recommended_gear),
     ],
 )
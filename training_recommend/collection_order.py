@@ -18,6 +18,9 @@ This file can be easily replaced to modify the information collection order
 without changing the main prompts.py file.
 """
 
+import functools
+from typing import NamedTuple
+
 # Information collection order configuration
 # Each item defines: field_name, question_template
 INFORMATION_COLLECTION_ORDER = [
@@ -88,28 +91,125 @@ INFORMATION_COLLECTION_ORDER = [
 ]
 
 
+WELCOME_MESSAGE = "Hello! 👋 I'm your professional training plan generation assistant. I can create a personalized weekly training plan based on your personal information, sport preferences, weather conditions, and geographical location in your area. Let me learn about your situation so I can generate the most suitable training plan for you!"
+
+# Example user answers used to build the example conversation, in collection order
+EXAMPLE_RESPONSES = (
+    "25",
+    "male",
+    "70",
+    "175",
+    "No injuries",
+    "intermediate",
+    "3",
+    "15",
+    "5km: 25:00",
+    "train for a 10km race",
+    "Monday/Wednesday/Friday, 1 hour each",
+    "road",
+    "neutral",
+    "outer edge",
+    "firm, responsive ride",
+    "New York",
+)
+
+
+class PromptFragments(NamedTuple):
+    """Prompt text derived from INFORMATION_COLLECTION_ORDER."""
+
+    collection_order_text: str
+    field_order: tuple
+    first_question: str
+    first_field_name: str
+    question_sequence_text: str
+    example_questions: tuple
+    example_conversation_text: str
+
+
+@functools.cache
+def build_prompt_fragments() -> PromptFragments:
+    """Build all prompt fragments in a single pass over the collection order.
+
+    The result is cached, so the collection order is only walked once per process.
+
+    Returns:
+        PromptFragments: All derived prompt strings
+    """
+    order_lines = []
+    sequence_items = []
+    fields = []
+    questions = []
+    conversation_lines = []
+
+    for i, item in enumerate(INFORMATION_COLLECTION_ORDER, 1):
+        field = item["field"]
+        question = item["question"]
+        field_name = field.replace("_", " ").title()
+
+        fields.append(field)
+        questions.append(question)
+        order_lines.append(f"{i}. **{field_name}** - Ask: \"{question}\"")
+        sequence_items.append(f"Question {i}: {field_name}")
+
+        # Example answer to the previous question, followed by this question
+        if 1 < i <= len(EXAMPLE_RESPONSES):
+            conversation_lines.append(f'User: "{EXAMPLE_RESPONSES[i - 2]}"')
+            conversation_lines.append(f'Agent: "Got it, recorded. {question}"')
+
+    first_question = questions[0] if questions else "Please tell me your age, for example: 25"
+    first_field_name = fields[0] if fields else "age"
+
+    conversation_lines.insert(
+        0, f'Agent: "{WELCOME_MESSAGE} {questions[0] if questions else ""}"'
+    )
+
+    # Add final response and completion
+    if len(EXAMPLE_RESPONSES) >= len(questions):
+        conversation_lines.append(f'User: "{EXAMPLE_RESPONSES[-1]}"')
+
+    conversation_lines.append('Agent: "Great! I\'ve learned about your situation. Now let me generate a personalized training plan for you..."')
+    conversation_lines.append('[Agent calls tools: get_weather_forecast, search_nearby_venues, get_recommended_gear]')
+    conversation_lines.append('Agent: {"metadata":{...},"training_plan":[...],"summary":{...}}')
+    conversation_lines.append('[Note: Agent directly outputs JSON, no other text]')
+
+    return PromptFragments(
+        collection_order_text="\n".join(order_lines),
+        field_order=tuple(fields),
+        first_question=first_question,
+        first_field_name=first_field_name,
+        question_sequence_text=" → ".join(sequence_items),
+        example_questions=tuple(questions),
+        example_conversation_text="\n".join(conversation_lines),
+    )
+
+
+# Prompt fragments are pure functions of INFORMATION_COLLECTION_ORDER, so compute them once
+FRAGMENTS = build_prompt_fragments()
+_COLLECTION_ORDER_TEXT = FRAGMENTS.collection_order_text
+_FIELD_ORDER = FRAGMENTS.field_order
+_FIRST_QUESTION = FRAGMENTS.first_question
+_FIRST_FIELD_NAME = FRAGMENTS.first_field_name
+_QUESTION_SEQUENCE_TEXT = FRAGMENTS.question_sequence_text
+_EXAMPLE_QUESTIONS = FRAGMENTS.example_questions
+_EXAMPLE_CONVERSATION_TEXT = FRAGMENTS.example_conversation_text
+
+
 def get_collection_order_text() -> str:
     """Generate the information collection order text for prompts.
     
     Returns:
         str: Formatted text describing the information collection order
     """
-    lines = []
-    for i, item in enumerate(INFORMATION_COLLECTION_ORDER, 1):
-        field_name = item["field"].replace("_", " ").title()
-        question = item["question"]
-        lines.append(f"{i}. **{field_name}** - Ask: \"{question}\"")
-    
-    return "\n".join(lines)
+    return _COLLECTION_ORDER_TEXT
 
 
-def get_field_order() -> list:
-    """Get the ordered list of field names.
+def get_field_order() -> tuple:
+    """Get the ordered field names.
     
     Returns:
-        list: List of field names in collection order
+        tuple: Field names in collection order
     """
-    return [item["field"] for item in INFORMATION_COLLECTION_ORDER]
+    return _FIELD_ORDER
 
 
 def get_first_question() -> str:
@@ -118,9 +218,7 @@ def get_first_question() -> str:
     Returns:
         str: The first question text
     """
-    if INFORMATION_COLLECTION_ORDER:
-        return INFORMATION_COLLECTION_ORDER[0]["question"]
-    return "Please tell me your age, for example: 25"
+    return _FIRST_QUESTION
 
 
 def get_first_field_name() -> str:
@@ -129,9 +227,7 @@ def get_first_field_name() -> str:
     Returns:
         str: The first field name
     """
-    if INFORMATION_COLLECTION_ORDER:
-        return INFORMATION_COLLECTION_ORDER[0]["field"]
-    return "age"
+    return _FIRST_FIELD_NAME
 
 
 def get_question_sequence_text() -> str:
@@ -140,21 +236,16 @@ def get_question_sequence_text() -> str:
     Returns:
         str: Formatted text describing the question sequence
     """
-    field_names = []
-    for i, item in enumerate(INFORMATION_COLLECTION_ORDER, 1):
-        field_name = item["field"].replace("_", " ").title()
-        field_names.append(f"Question {i}: {field_name}")
-    
-    return " → ".join(field_names)
+    return _QUESTION_SEQUENCE_TEXT
 
 
-def get_example_conversation_questions() -> list:
-    """Get list of questions for example conversation.
+def get_example_conversation_questions() -> tuple:
+    """Get the questions for example conversation.
     
     Returns:
-        list: List of question texts in order
+        tuple: Question texts in order
     """
-    return [item["question"] for item in INFORMATION_COLLECTION_ORDER]
+    return _EXAMPLE_QUESTIONS
 
 
 def get_example_conversation_text() -> str:
@@ -163,45 +254,4 @@ def get_example_conversation_text() -> str:
     Returns:
         str: Formatted example conversation text
     """
-    questions = get_example_conversation_questions()
-    welcome_msg = "Hello! 👋 I'm your professional training plan generation assistant. I can create a personalized weekly training plan based on your personal information, sport preferences, weather conditions, and geographical location in your area. Let me learn about your situation so I can generate the most suitable training plan for you!"
-    
-    lines = [
-        f'Agent: "{welcome_msg} {questions[0] if questions else ""}"'
-    ]
-    
-    # Generate example responses and follow-up questions
-    example_responses = [
-        "25",
-        "male",
-        "70",
-        "175",
-        "No injuries",
-        "intermediate",
-        "3",
-        "15",
-        "5km: 25:00",
-        "train for a 10km race",
-        "Monday/Wednesday/Friday, 1 hour each",
-        "road",
-        "neutral",
-        "outer edge",
-        "firm, responsive ride",
-        "New York"
-    ]
-    
-    for i, question in enumerate(questions[1:], 1):
-        if i < len(example_responses):
-            lines.append(f'User: "{example_responses[i-1]}"')
-            lines.append(f'Agent: "Got it, recorded. {question}"')
-    
-    # Add final response and completion
-    if len(example_responses) >= len(questions):
-        lines.append(f'User: "{example_responses[-1]}"')
-    
-    lines.append('Agent: "Great! I\'ve learned about your situation. Now let me generate a personalized training plan for you..."')
-    lines.append('[Agent calls tools: get_weather_forecast, search_nearby_venues, get_recommended_gear]')
-    lines.append('Agent: {"metadata":{...},"training_plan":[...],"summary":{...}}')
-    lines.append('[Note: Agent directly outputs JSON, no other text]')
-    
-    return "\n".join(lines)
+    return _EXAMPLE_CONVERSATION_TEXT
@@ -0,0 +1,104 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Training plan output models for the training recommendation agent."""
+
+from typing import Any, Dict, List, Optional
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class _PlanModel(BaseModel):
+    """Base model for the agent's JSON output; unknown keys are ignored."""
+
+    model_config = ConfigDict(extra="ignore")
+
+
+class Temperature(_PlanModel):
+    """Daily temperature range."""
+
+    high: Optional[float] = None
+    low: Optional[float] = None
+
+
+class DayWeather(_PlanModel):
+    """Weather summary for one day."""
+
+    condition: str = ""
+    condition_icon: str = ""
+    temperature: Optional[Temperature] = None
+    suitable_for_outdoor: Optional[bool] = None
+
+
+class Training(_PlanModel):
+    """Training session for one day."""
+
+    sport_type: str = ""
+    duration: str = ""
+    intensity: str = ""
+    description: str = ""
+
+
+class Venue(_PlanModel):
+    """Recommended venue for one day."""
+
+    name: str = ""
+    address: str = ""
+    distance: str = ""
+    rating: Optional[float] = None
+    map_url: Optional[str] = None
+
+
+class Gear(_PlanModel):
+    """Recommended gear for one day."""
+
+    shoes: List[str] = Field(default_factory=list)
+    clothing: List[str] = Field(default_factory=list)
+    accessories: List[str] = Field(default_factory=list)
+
+
+class Day(_PlanModel):
+    """One day of the training plan."""
+
+    date: str
+    day_of_week: str = ""
+    weather: Optional[DayWeather] = None
+    training: Optional[Training] = None
+    venue: Optional[Venue] = None
+    gear: Optional[Gear] = None
+    notes: str = ""
+
+
+class Metadata(_PlanModel):
+    """Plan metadata."""
+
+    user_info: Dict[str, Any] = Field(default_factory=dict)
+    generated_at: str = ""
+    plan_duration: str = ""
+
+
+class Summary(_PlanModel):
+    """Plan summary."""
+
+    total_days: Optional[int] = None
+    outdoor_days: Optional[int] = None
+    indoor_days: Optional[int] = None
+    sport_types_covered: List[str] = Field(default_factory=list)
+    general_advice: str = ""
+
+
+class TrainingPlan(_PlanModel):
+    """Training plan JSON produced by the agent."""
+
+    metadata: Metadata
+    training_plan: List[Day]
+    summary: Summary
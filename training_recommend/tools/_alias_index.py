@@ -0,0 +1,78 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Alias index for matching free-form sport type text to lookup tables."""
+
+import sys
+from typing import Dict, Generic, Mapping, Optional, TypeVar
+
+V = TypeVar("V")
+
+# Trie node key marking the end of an alias
+_END = ""
+
+
+class AliasIndex(Generic[V]):
+    """Case-insensitive alias lookup, built once from an alias -> value mapping.
+
+    A lookup tries, in order:
+      1. an exact alias match;
+      2. the longest alias contained in the text (one trie walk per start position,
+         e.g. "晨跑跑步" -> "跑步");
+      3. an alias containing the text (precomputed substring table, e.g. "跑" ->
+         "长跑", "run" -> "running"); the first alias in mapping order wins.
+    """
+
+    def __init__(self, mapping: Mapping[str, V]):
+        self._exact: Dict[str, V] = {}
+        self._substrings: Dict[str, V] = {}
+        self._trie: dict = {}
+
+        for alias, value in mapping.items():
+            # lower() returns a new string; intern it so every table shares one copy
+            alias = sys.intern(alias.lower())
+            self._exact.setdefault(alias, value)
+
+            node = self._trie
+            for char in alias:
+                node = node.setdefault(char, {})
+            node.setdefault(_END, value)
+
+            for start in range(len(alias)):
+                for end in range(start + 1, len(alias) + 1):
+                    self._substrings.setdefault(alias[start:end], value)
+
+    def lookup(self, text: str) -> Optional[V]:
+        """Find the value for an alias matching ``text``, or None if nothing matches."""
+        text = text.lower()
+
+        value = self._exact.get(text)
+        if value is not None:
+            return value
+
+        best = None
+        best_len = 0
+        for start in range(len(text)):
+            node = self._trie
+            for end in range(start, len(text)):
+                node = node.get(text[end])
+                if node is None:
+                    break
+                if _END in node and end + 1 - start > best_len:
+                    best = node[_END]
+                    best_len = end + 1 - start
+        if best is not None:
+            return best
+
+        return self._substrings.get(text)
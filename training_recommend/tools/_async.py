@@ -0,0 +1,66 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Async adapters that let the agent run parallel tool calls concurrently."""
+
+import asyncio
+import functools
+from typing import Any, Callable, Coroutine, Optional, Tuple
+
+# Maximum number of tool calls running at the same time
+MAX_CONCURRENT_TOOL_CALLS = 8
+
+# The semaphore is created lazily for the running event loop: an asyncio.Semaphore
+# binds to the loop that first waits on it, so an import-time instance would break
+# once a second loop (e.g. tests or successive asyncio.run calls) awaits it.
+# Only the latest loop's semaphore is kept (one loop runs tools at a time, as under
+# uvicorn), so finished loops are not retained.
+_tool_semaphore_state: Tuple[Optional[asyncio.AbstractEventLoop], Optional[asyncio.Semaphore]] = (
+    None,
+    None,
+)
+
+
+def _tool_semaphore() -> asyncio.Semaphore:
+    """Get the tool-call semaphore for the running event loop, creating it on first use."""
+    global _tool_semaphore_state
+    loop = asyncio.get_running_loop()
+    owner, semaphore = _tool_semaphore_state
+    if owner is not loop or semaphore is None:
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_TOOL_CALLS)
+        _tool_semaphore_state = (loop, semaphore)
+    return semaphore
+
+
+def concurrent_tool(func: Callable[..., Any]) -> Callable[..., Coroutine[Any, Any, Any]]:
+    """Wrap a blocking tool function as a coroutine that runs in a worker thread.
+
+    When the model emits several function calls in one turn, ADK awaits the async
+    tools together with asyncio.gather, so wrapped tools overlap their network I/O
+    instead of blocking the event loop one after another. The signature and
+    docstring are preserved, so the tool declaration sent to the model is unchanged.
+
+    Args:
+        func: Synchronous tool function
+
+    Returns:
+        An async function with the same signature as ``func``
+    """
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        async with _tool_semaphore():
+            return await asyncio.to_thread(func, *args, **kwargs)
+
+    return wrapper
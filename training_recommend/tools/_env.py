@@ -0,0 +1,54 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Shared environment / API key resolution for the agent tools."""
+
+import functools
+import os
+from pathlib import Path
+
+_LOADED = False
+
+
+def load_env() -> None:
+    """Load the project-root .env file once per process."""
+    global _LOADED
+    if _LOADED:
+        return
+    _LOADED = True
+    try:
+        from dotenv import load_dotenv
+        # Project root is three levels up from this file
+        env_path = Path(__file__).parent.parent.parent / ".env"
+        if env_path.is_file():
+            load_dotenv(env_path, override=True)
+    except ImportError:
+        pass  # dotenv not available, rely on system environment variables
+
+
+@functools.lru_cache(maxsize=1)
+def maps_api_key() -> str:
+    """Google Maps Platform API key from the environment ("" if not set)."""
+    load_env()
+    return os.environ.get("GOOGLE_MAPS_API_KEY") or os.environ.get("MAPS_API_KEY", "")
+
+
+@functools.lru_cache(maxsize=1)
+def openweather_api_key() -> str:
+    """OpenWeatherMap API key from the environment ("" if not set)."""
+    load_env()
+    return os.environ.get("OPENWEATHER_API_KEY") or os.environ.get("WEATHER_API_KEY", "")
+
+
+load_env()
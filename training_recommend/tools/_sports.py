@@ -0,0 +1,65 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Sport kinds and their aliases, shared by the gear and venue tools."""
+
+import functools
+from enum import IntEnum
+from typing import Dict, Optional
+from ._alias_index import AliasIndex
+
+
+class SportKind(IntEnum):
+    """Canonical sport kinds; values index the per-tool payload tuples."""
+
+    RUNNING = 0
+    SWIMMING = 1
+    STRENGTH = 2
+    YOGA = 3
+    CYCLING = 4
+    BASKETBALL = 5
+    BADMINTON = 6
+    HIKING = 7
+
+
+# Sport type aliases (Chinese / English) -> sport kind
+# 顺序有意义：AliasIndex 子串匹配时，排在前面的别名优先
+_ALIAS_TO_KIND: Dict[str, SportKind] = {
+    "长跑": SportKind.RUNNING,
+    "跑步": SportKind.RUNNING,
+    "running": SportKind.RUNNING,
+    "游泳": SportKind.SWIMMING,
+    "swimming": SportKind.SWIMMING,
+    "力量训练": SportKind.STRENGTH,
+    "健身": SportKind.STRENGTH,
+    "gym": SportKind.STRENGTH,
+    "瑜伽": SportKind.YOGA,
+    "yoga": SportKind.YOGA,
+    "骑行": SportKind.CYCLING,
+    "自行车": SportKind.CYCLING,
+    "cycling": SportKind.CYCLING,
+    "篮球": SportKind.BASKETBALL,
+    "羽毛球": SportKind.BADMINTON,
+    "爬山": SportKind.HIKING,
+}
+_KIND_INDEX = AliasIndex(_ALIAS_TO_KIND)
+
+
+@functools.lru_cache(maxsize=256)
+def lookup_sport_kind(sport_type: str) -> Optional[SportKind]:
+    """Resolve free-form sport type text to a SportKind, or None if unknown.
+
+    Note SportKind.RUNNING == 0 is falsy, so callers must compare against None.
+    """
+    return _KIND_INDEX.lookup(sport_type)
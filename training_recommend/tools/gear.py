@@ -14,94 +14,75 @@
 
 """Gear recommendation tool for training recommendation agent."""
 
-from typing import Dict, Any
+from typing import Dict, Any, List, Tuple
 from google.adk.tools import ToolContext
+from ._sports import SportKind, _ALIAS_TO_KIND, lookup_sport_kind
 
 
-# Gear recommendation map based on sport type
-GEAR_MAP = {
-    "长跑": {
+# Gear recommendation per sport kind
+_GEAR_BY_KIND = {
+    SportKind.RUNNING: {
         "shoes": ["跑步鞋", "运动鞋"],
         "clothing": ["速干T恤", "运动短裤", "运动袜"],
         "accessories": ["运动手表", "水壶", "毛巾"],
     },
-    "跑步": {
-        "shoes": ["跑步鞋", "运动鞋"],
-        "clothing": ["速干T恤", "运动短裤", "运动袜"],
-        "accessories": ["运动手表", "水壶", "毛巾"],
-    },
-    "running": {
-        "shoes": ["跑步鞋", "运动鞋"],
-        "clothing": ["速干T恤", "运动短裤", "运动袜"],
-        "accessories": ["运动手表", "水壶", "毛巾"],
-    },
-    "游泳": {
-        "shoes": [],
-        "clothing": ["泳衣", "泳帽", "泳镜", "浴巾"],
-        "accessories": ["防水袋", "拖鞋", "洗护用品"],
-    },
-    "swimming": {
+    SportKind.SWIMMING: {
         "shoes": [],
         "clothing": ["泳衣", "泳帽", "泳镜", "浴巾"],
         "accessories": ["防水袋", "拖鞋", "洗护用品"],
     },
-    "力量训练": {
-        "shoes": ["训练鞋"],
-        "clothing": ["运动背心", "运动长裤", "运动手套"],
-        "accessories": ["水壶", "毛巾", "护腕"],
-    },
-    "健身": {
-        "shoes": ["训练鞋"],
-        "clothing": ["运动背心", "运动长裤", "运动手套"],
-        "accessories": ["水壶", "毛巾", "护腕"],
-    },
-    "gym": {
+    SportKind.STRENGTH: {
         "shoes": ["训练鞋"],
         "clothing": ["运动背心", "运动长裤", "运动手套"],
         "accessories": ["水壶", "毛巾", "护腕"],
     },
-    "瑜伽": {
+    SportKind.YOGA: {
         "shoes": [],
         "clothing": ["瑜伽服", "瑜伽裤", "运动内衣"],
         "accessories": ["瑜伽垫", "瑜伽砖", "瑜伽带"],
     },
-    "yoga": {
-        "shoes": [],
-        "clothing": ["瑜伽服", "瑜伽裤", "运动内衣"],
-        "accessories": ["瑜伽垫", "瑜伽砖", "瑜伽带"],
-    },
-    "骑行": {
-        "shoes": ["骑行鞋"],
-        "clothing": ["骑行服", "骑行裤", "头盔"],
-        "accessories": ["水壶", "手套", "护目镜"],
-    },
-    "自行车": {
+    SportKind.CYCLING: {
         "shoes": ["骑行鞋"],
         "clothing": ["骑行服", "骑行裤", "头盔"],
         "accessories": ["水壶", "手套", "护目镜"],
     },
-    "cycling": {
-        "shoes": ["骑行鞋"],
-        "clothing": ["骑行服", "骑行裤", "头盔"],
-        "accessories": ["水壶", "手套", "护目镜"],
-    },
-    "篮球": {
+    SportKind.BASKETBALL: {
         "shoes": ["篮球鞋"],
         "clothing": ["运动背心", "运动短裤"],
         "accessories": ["护膝", "护腕", "水壶"],
     },
-    "羽毛球": {
+    SportKind.BADMINTON: {
         "shoes": ["羽毛球鞋"],
         "clothing": ["运动T恤", "运动短裤"],
         "accessories": ["羽毛球拍", "羽毛球", "护腕"],
     },
-    "爬山": {
+    SportKind.HIKING: {
         "shoes": ["登山鞋"],
         "clothing": ["速干衣", "冲锋衣", "运动长裤"],
         "accessories": ["登山杖", "背包", "水壶"],
     },
 }
 
+# Gear recommendation map based on sport type alias (kept for backward compatibility)
+GEAR_MAP = {alias: _GEAR_BY_KIND[kind] for alias, kind in _ALIAS_TO_KIND.items()}
+
+# Default gear when the sport type is unknown
+_DEFAULT_GEAR = {
+    "shoes": ["运动鞋"],
+    "clothing": ["运动服", "运动裤"],
+    "accessories": ["水壶", "毛巾"],
+}
+
+
+def _freeze_gear(gear: Dict[str, List[str]]) -> Tuple[Tuple[str, Tuple[str, ...]], ...]:
+    """Convert a gear dict to an immutable tuple of (category, items) pairs."""
+    return tuple((category, tuple(items)) for category, items in gear.items())
+
+
+# Frozen payloads indexed by SportKind, so callers cannot mutate the shared tables
+_KIND_TO_GEAR = tuple(_freeze_gear(_GEAR_BY_KIND[kind]) for kind in SportKind)
+_DEFAULT_GEAR_FROZEN = _freeze_gear(_DEFAULT_GEAR)
+
 
 def get_recommended_gear(
     sport_type: str, tool_context: ToolContext = None
@@ -121,25 +102,9 @@ def get_recommended_gear(
             - sport_type: The sport type
             - recommended_gear: Dictionary with shoes, clothing, and accessories
     """
-    sport_type_lower = sport_type.lower()
-
-    # Try to find exact match first
-    gear = GEAR_MAP.get(sport_type) or GEAR_MAP.get(sport_type_lower)
-
-    # If not found, try to match by keyword
-    if not gear:
-        for key, value in GEAR_MAP.items():
-            if key.lower() in sport_type_lower or sport_type_lower in key.lower():
-                gear = value
-                break
-
-    # Default gear if not found
-    if not gear:
-        gear = {
-            "shoes": ["运动鞋"],
-            "clothing": ["运动服", "运动裤"],
-            "accessories": ["水壶", "毛巾"],
-        }
+    kind = lookup_sport_kind(sport_type)
+    frozen = _DEFAULT_GEAR_FROZEN if kind is None else _KIND_TO_GEAR[kind]
+    gear = {category: list(items) for category, items in frozen}
 
     return {
         "status": "success",
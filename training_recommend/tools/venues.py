@@ -14,26 +14,50 @@
 
 """Venue search tool for training recommendation agent."""
 
-import os
+import functools
+import heapq
 import logging
 import math
-from typing import Dict, Any, List
-from pathlib import Path
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Tuple
 import googlemaps
+import numpy as np
+from cachetools import TTLCache, cached
 from google.adk.tools import ToolContext
-
-# Try to load .env file if not already loaded
-try:
-    from dotenv import load_dotenv
-    env_path = Path(__file__).parent.parent.parent / ".env"
-    if env_path.exists():
-        load_dotenv(env_path, override=True)
-except ImportError:
-    pass
+from . import _env
+from ._sports import SportKind, lookup_sport_kind
 
 logger = logging.getLogger(__name__)
 
 
+@functools.lru_cache(maxsize=1)
+def _get_gmaps_client(api_key: str) -> googlemaps.Client:
+    """Get a shared Google Maps client (and its connection pool) for an API key."""
+    return googlemaps.Client(key=api_key)
+
+
+# Places results keyed on (lat, lng) rounded to 3 decimals (~111 m), place type and radius
+_PLACES_CACHE = TTLCache(maxsize=512, ttl=600)
+
+
+@cached(
+    _PLACES_CACHE,
+    key=lambda gmaps, lat, lng, place_type, radius: (round(lat, 3), round(lng, 3), place_type, radius),
+    lock=threading.Lock(),
+)
+def _places_nearby(
+    gmaps: googlemaps.Client, lat: float, lng: float, place_type: str, radius: int
+) -> Dict[str, Any]:
+    """Run a Places nearby search, reusing recent results for the same area."""
+    return gmaps.places_nearby(
+        location=(lat, lng),
+        radius=radius,
+        type=place_type,
+        language='zh-CN'
+    )
+
+
 def search_nearby_venues(
     latitude: float,
     longitude: float,
@@ -62,7 +86,7 @@ def search_nearby_venues(
     if tool_context:
         maps_api_key = tool_context.state.get("maps_api_key", "")
     if not maps_api_key:
-        maps_api_key = os.environ.get("GOOGLE_MAPS_API_KEY") or os.environ.get("MAPS_API_KEY", "")
+        maps_api_key = _env.maps_api_key()
     
     if not maps_api_key:
         logger.warning("⚠️  Google Maps API key not found")
@@ -73,61 +97,82 @@ def search_nearby_venues(
         }
     
     try:
-        gmaps = googlemaps.Client(key=maps_api_key)
+        gmaps = _get_gmaps_client(maps_api_key)
         
         # Map sport type to Google Places API types
         place_types = _map_sport_to_place_types(sport_type)
         
-        all_venues = []
+        raw_places = []
+        place_lats = []
+        place_lngs = []
         seen_place_ids = set()
         
-        # Search for each place type
-        for place_type in place_types:
+        # Search all place types in parallel; results are merged in place type order
+        with ThreadPoolExecutor(max_workers=len(place_types)) as executor:
+            futures = [
+                executor.submit(_places_nearby, gmaps, latitude, longitude, place_type, radius)
+                for place_type in place_types
+            ]
+        
+        for place_type, future in zip(place_types, futures):
             try:
-                places_result = gmaps.places_nearby(
-                    location=(latitude, longitude),
-                    radius=radius,
-                    type=place_type,
-                    language='zh-CN'
-                )
+                places_result = future.result()
                 
                 for place in places_result.get("results", []):
                     place_id = place.get("place_id")
-                    if place_id and place_id not in seen_place_ids:
-                        seen_place_ids.add(place_id)
-                        
-                        # Calculate distance
-                        place_lat = place["geometry"]["location"]["lat"]
-                        place_lng = place["geometry"]["location"]["lng"]
-                        distance = _calculate_distance(
-                            latitude, longitude, place_lat, place_lng
-                        )
-                        
-                        venue_info = {
-                            "name": place.get("name", "未知地点"),
-                            "address": place.get("vicinity", place.get("formatted_address", "")),
-                            "distance": _format_distance(distance),
-                            "distance_meters": round(distance),
-                            "rating": place.get("rating", 0),
-                            "place_id": place_id,
-                            "types": place.get("types", []),
-                            "location": {
-                                "latitude": place_lat,
-                                "longitude": place_lng
-                            }
-                        }
-                        
-                        all_venues.append(venue_info)
+                    if not place_id or place_id in seen_place_ids:
+                        continue
+                    # Skip malformed places (no usable coordinates) instead of failing the search
+                    try:
+                        location = place["geometry"]["location"]
+                        place_lat = float(location["lat"])
+                        place_lng = float(location["lng"])
+                    except (KeyError, TypeError, ValueError):
+                        logger.debug("Skipping place %s without valid coordinates", place_id)
+                        continue
+                    seen_place_ids.add(place_id)
+                    raw_places.append(place)
+                    place_lats.append(place_lat)
+                    place_lngs.append(place_lng)
                         
             except Exception as e:
-                logger.warning(f"⚠️  Error searching for {place_type}: {e}")
+                logger.warning("⚠️  Error searching for %s: %s", place_type, e)
                 continue
         
-        # Sort by distance and rating
-        all_venues.sort(key=lambda x: (x["distance_meters"], -x["rating"]))
+        # Pack coordinates into contiguous float32 arrays and compute all distances at once
+        count = len(raw_places)
+        distances = _calculate_distances(
+            latitude,
+            longitude,
+            np.fromiter(place_lats, dtype=np.float32, count=count),
+            np.fromiter(place_lngs, dtype=np.float32, count=count),
+        ).tolist()
         
-        # Limit results
-        venues = all_venues[:max_results]
+        # Pick the top max_results on lightweight (distance, -rating, index) keys first;
+        # the index breaks ties in search order and keeps the place dicts out of comparisons
+        candidates = (
+            (round(distance), -place.get("rating", 0), index, distance)
+            for index, (place, distance) in enumerate(zip(raw_places, distances))
+        )
+        winners = heapq.nsmallest(max_results, candidates)
+        
+        # Build venue dicts only for the winners
+        venues = []
+        for distance_meters, _, index, distance in winners:
+            place = raw_places[index]
+            venues.append({
+                "name": place.get("name", "未知地点"),
+                "address": place.get("vicinity", place.get("formatted_address", "")),
+                "distance": _format_distance(distance),
+                "distance_meters": distance_meters,
+                "rating": place.get("rating", 0),
+                "place_id": place["place_id"],
+                "types": place.get("types", []),
+                "location": {
+                    "latitude": place_lats[index],
+                    "longitude": place_lngs[index]
+                }
+            })
         
         return {
             "status": "success",
@@ -137,7 +182,7 @@ def search_nearby_venues(
         }
         
     except Exception as e:
-        logger.error(f"❌ Venue search error: {e}")
+        logger.error("❌ Venue search error: %s", e)
         return {
             "status": "error",
             "venues": [],
@@ -145,60 +190,47 @@ def search_nearby_venues(
         }
 
 
-def _map_sport_to_place_types(sport_type: str) -> List[str]:
+_EARTH_RADIUS_M = np.float32(6371000.0)
+
+# Mapping of sport kinds to Google Places API types
+_PLACE_TYPES_BY_KIND = {
+    SportKind.RUNNING: ("park", "route"),
+    SportKind.SWIMMING: ("swimming_pool", "gym"),
+    SportKind.STRENGTH: ("gym", "health"),
+    SportKind.YOGA: ("gym", "yoga"),
+    SportKind.CYCLING: ("park", "route", "bicycle_store"),
+    SportKind.BASKETBALL: ("basketball_court", "gym"),
+    SportKind.BADMINTON: ("gym", "sports_complex"),
+    SportKind.HIKING: ("park", "natural_feature"),
+}
+# Payload tuple indexed by SportKind
+_KIND_TO_PLACE_TYPES = tuple(_PLACE_TYPES_BY_KIND[kind] for kind in SportKind)
+
+
+def _map_sport_to_place_types(sport_type: str) -> Tuple[str, ...]:
     """Map sport type to Google Places API types."""
-    sport_lower = sport_type.lower()
-    
-    # Mapping of sport types to Google Places API types
-    sport_mapping = {
-        "长跑": ["park", "route"],
-        "跑步": ["park", "route"],
-        "running": ["park", "route"],
-        "游泳": ["swimming_pool", "gym"],
-        "swimming": ["swimming_pool", "gym"],
-        "力量训练": ["gym", "health"],
-        "健身": ["gym", "health"],
-        "gym": ["gym", "health"],
-        "瑜伽": ["gym", "yoga"],
-        "yoga": ["gym", "yoga"],
-        "骑行": ["park", "route", "bicycle_store"],
-        "自行车": ["park", "route", "bicycle_store"],
-        "cycling": ["park", "route", "bicycle_store"],
-        "篮球": ["basketball_court", "gym"],
-        "羽毛球": ["gym", "sports_complex"],
-        "爬山": ["park", "natural_feature"],
-    }
-    
-    # Try exact match first
-    if sport_type in sport_mapping:
-        return sport_mapping[sport_type]
-    
-    # Try case-insensitive match
-    for key, value in sport_mapping.items():
-        if key.lower() in sport_lower or sport_lower in key.lower():
-            return value
-    
+    kind = lookup_sport_kind(sport_type)
     # Default: return gym and park
-    return ["gym", "park"]
+    return ("gym", "park") if kind is None else _KIND_TO_PLACE_TYPES[kind]
 
 
-def _calculate_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
-    """Calculate distance between two coordinates using Haversine formula.
-    
-    Returns distance in meters.
-    """
-    R = 6371000  # Earth radius in meters
-    
-    phi1 = math.radians(lat1)
-    phi2 = math.radians(lat2)
-    delta_phi = math.radians(lat2 - lat1)
-    delta_lambda = math.radians(lon2 - lon1)
+def _calculate_distances(
+    lat1: float, lon1: float, lats2: np.ndarray, lons2: np.ndarray
+) -> np.ndarray:
+    """Calculate Haversine distances from one coordinate to many in float32.
     
-    a = math.sin(delta_phi / 2) ** 2 + \
-        math.cos(phi1) * math.cos(phi2) * math.sin(delta_lambda / 2) ** 2
-    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+    The origin terms are computed once; float32 keeps errors to about a meter
+    at venue search radii (< 50 km) while halving memory traffic.
     
-    return R * c
+    Returns distances in meters.
+    """
+    lat1_rad = np.float32(math.radians(lat1))
+    cos_lat1 = np.cos(lat1_rad)
+    lats2_rad = np.radians(lats2)
+    dlat = lats2_rad - lat1_rad
+    dlon = np.radians(lons2 - np.float32(lon1))
+    a = np.sin(dlat * 0.5) ** 2 + cos_lat1 * np.cos(lats2_rad) * np.sin(dlon * 0.5) ** 2
+    return (2 * _EARTH_RADIUS_M) * np.arcsin(np.sqrt(a))
 
 
 def _format_distance(distance_meters: float) -> str:
@@ -14,26 +14,113 @@
 
 """Weather forecast tool for training recommendation agent."""
 
-import os
+import copy
 import logging
+import threading
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import datetime, timedelta
 from typing import Dict, Any
-from pathlib import Path
+import numpy as np
 import requests
+from cachetools import TTLCache
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from google.adk.tools import ToolContext
+from . import _env
+from ._async import MAX_CONCURRENT_TOOL_CALLS
 
-# Try to load .env file if not already loaded
 try:
-    from dotenv import load_dotenv
-    # Try to find .env file in project root (two levels up from this file)
-    env_path = Path(__file__).parent.parent.parent / ".env"
-    if env_path.exists():
-        load_dotenv(env_path, override=True)
+    import orjson
 except ImportError:
-    pass  # dotenv not available, rely on system environment variables
+    orjson = None  # optional, fall back to requests' stdlib json decoding
 
 logger = logging.getLogger(__name__)
 
+# 复用 TCP/TLS 连接：Google 与 OpenWeatherMap 共用一个带连接池的 Session
+_SESSION = requests.Session()
+_SESSION.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=8,
+        # 只重试 502/503/504：连接/读取超时不重试，否则 timeout=10 时单个 API 最坏要等约 30 秒
+        # raise_on_status=False：重试耗尽后仍交给 raise_for_status() 抛 HTTPError
+        max_retries=Retry(
+            total=2,
+            connect=0,
+            read=0,
+            status=2,
+            backoff_factor=0.3,
+            status_forcelist=(502, 503, 504),
+            raise_on_status=False,
+        ),
+    ),
+)
+
+# 天气 API 请求线程池：每次预报最多 2 个在途请求，按并发工具调用数留足线程，
+# 落选的慢请求不会占满线程而拖慢新的预报
+_PROVIDER_POOL = ThreadPoolExecutor(
+    max_workers=2 * MAX_CONCURRENT_TOOL_CALLS, thread_name_prefix="weather"
+)
+
+# Google 领先 OpenWeatherMap 的时间（秒）：超时或失败后才请求备用 API
+_PROVIDER_HEAD_START = 2.0
+
+# 预报缓存：(lat, lon 取两位小数 ≈1.1km 网格, days, 当天日期) -> 结果，30 分钟过期
+# 只缓存真实 API 的成功结果，模拟数据不入缓存
+_WEATHER_CACHE = TTLCache(maxsize=256, ttl=1800)
+_WEATHER_CACHE_LOCK = threading.Lock()
+
+# Weather condition maps (English -> Chinese), merged once at import
+_OPENWEATHER_CONDITION_MAP = {
+    "clear": "晴天",
+    "clouds": "多云",
+    "rain": "雨天",
+    "drizzle": "小雨",
+    "thunderstorm": "雷雨",
+    "snow": "雪天",
+    "mist": "雾",
+    "fog": "雾",
+    "haze": "雾",
+}
+
+_GENERAL_CONDITION_MAP = {
+    "clear": "晴天",
+    "sunny": "晴天",
+    "partly cloudy": "多云",
+    "cloudy": "多云",
+    "overcast": "阴天",
+    "rain": "雨天",
+    "rainy": "雨天",
+    "drizzle": "小雨",
+    "showers": "阵雨",
+    "thunderstorm": "雷雨",
+    "snow": "雪天",
+    "snowy": "雪天",
+    "mist": "雾",
+    "fog": "雾",
+    "foggy": "雾",
+}
+
+_ALL_CONDITION_MAP = {**_OPENWEATHER_CONDITION_MAP, **_GENERAL_CONDITION_MAP}
+_ALL_CONDITION_ITEMS = tuple(_ALL_CONDITION_MAP.items())
+
+_DAYS_CN = ("周一", "周二", "周三", "周四", "周五", "周六", "周日")
+
+# 不适合户外训练的天气（雨、雪类），取值与上面中文映射的输出一致
+_OUTDOOR_UNSUITABLE = frozenset({"雨天", "小雨", "雷雨", "阵雨", "雪天"})
+
+_ICON_MAP = {
+    "晴天": "☀️",
+    "多云": "⛅",
+    "雨天": "🌧️",
+    "小雨": "🌦️",
+    "雷雨": "⛈️",
+    "雪天": "❄️",
+    "雾": "🌫️",
+}
+
 
 def get_weather_forecast(
     latitude: float,
@@ -60,56 +147,82 @@ def get_weather_forecast(
     """
     days = min(max(days, 1), 7)  # Clamp between 1 and 7
 
-    # 降级链：Google Weather API → OpenWeatherMap API → 模拟数据
-    
-    # Step 1: 尝试 Google Weather API
+    cache_key = (round(latitude, 2), round(longitude, 2), days, datetime.now().date())
+    with _WEATHER_CACHE_LOCK:
+        cached = _WEATHER_CACHE.get(cache_key)
+    if cached is not None:
+        # 返回副本：缓存条目被多个调用方共享 30 分钟，不能被修改
+        return copy.deepcopy(cached)
+
+    # 降级链：Google Weather API →（超时后并发）OpenWeatherMap API → 模拟数据
+    openweather_key = _env.openweather_api_key()
+    log_info = logger.isEnabledFor(logging.INFO)
+
+    # tool_context 中的 Google key 优先于环境变量
     google_api_key = None
     if tool_context:
         google_api_key = tool_context.state.get("maps_api_key", "")
     if not google_api_key:
-        google_api_key = os.environ.get("GOOGLE_MAPS_API_KEY") or os.environ.get("MAPS_API_KEY", "")
-    
+        google_api_key = _env.maps_api_key()
+
+    providers = []
     if google_api_key:
-        try:
-            logger.info(f"🌐 Attempting Google Weather API...")
-            result = _get_weather_from_google(latitude, longitude, days, google_api_key)
-            logger.info(f"✅ Google Weather API succeeded")
-            return result
-        except requests.exceptions.HTTPError as e:
-            # 检查是否是位置不支持的错误
-            if "Location not supported" in str(e) or "not supported for this location" in str(e).lower():
-                logger.warning(f"⚠️  Location ({latitude}, {longitude}) not supported by Google Weather API")
-            else:
-                logger.warning(f"⚠️  Google Weather API failed: {e}")
-            logger.info(f"🔄 Falling back to OpenWeatherMap API...")
-        except Exception as e:
-            logger.warning(f"⚠️  Google Weather API error: {e}")
-            logger.info(f"🔄 Falling back to OpenWeatherMap API...")
-    else:
-        logger.info(f"ℹ️  Google Maps API key not found, skipping Google Weather API")
-        logger.info(f"🔄 Trying OpenWeatherMap API...")
-    
-    # Step 2: 尝试 OpenWeatherMap API
-    openweather_key = os.environ.get("OPENWEATHER_API_KEY") or os.environ.get("WEATHER_API_KEY")
-    
+        providers.append(("Google Weather API", _get_weather_from_google, google_api_key))
+    elif log_info:
+        logger.info("ℹ️  Google Maps API key not found, skipping Google Weather API")
     if openweather_key:
-        try:
-            logger.info(f"🌐 Attempting OpenWeatherMap API...")
-            result = _get_weather_from_openweathermap(latitude, longitude, days, openweather_key)
-            logger.info(f"✅ OpenWeatherMap API succeeded")
+        providers.append(("OpenWeatherMap API", _get_weather_from_openweathermap, openweather_key))
+    elif log_info:
+        logger.info("ℹ️  OpenWeatherMap API key not found")
+
+    # Step 1-2: 按顺序启动（Google 优先），前一个 API 在 _PROVIDER_HEAD_START 秒内没有结果
+    # 才启动下一个，然后取最先成功的结果；正常情况下每次预报只调用一个第三方 API
+    pending = {}
+    remaining = list(providers)
+    while remaining or pending:
+        if remaining:
+            name, fetch, api_key = remaining.pop(0)
+            if log_info:
+                logger.info("🌐 Attempting %s...", name)
+            pending[_PROVIDER_POOL.submit(fetch, latitude, longitude, days, api_key)] = name
+        done, _ = wait(
+            pending,
+            timeout=_PROVIDER_HEAD_START if remaining else None,
+            return_when=FIRST_COMPLETED,
+        )
+        for future in done:
+            name = pending.pop(future)
+            try:
+                result = future.result()
+            except requests.exceptions.HTTPError as e:
+                # 检查是否是位置不支持的错误
+                if "Location not supported" in str(e) or "not supported for this location" in str(e).lower():
+                    logger.warning("⚠️  Location (%s, %s) not supported by %s", latitude, longitude, name)
+                else:
+                    logger.warning("⚠️  %s HTTP error: %s", name, e)
+                continue
+            except Exception as e:
+                logger.warning("⚠️  %s error: %s", name, e)
+                continue
+            with _WEATHER_CACHE_LOCK:
+                _WEATHER_CACHE[cache_key] = copy.deepcopy(result)
+            if log_info:
+                logger.info("✅ %s succeeded", name)
             return result
-        except requests.exceptions.HTTPError as e:
-            logger.warning(f"⚠️  OpenWeatherMap API HTTP error: {e}")
-        except Exception as e:
-            logger.warning(f"⚠️  OpenWeatherMap API error: {e}")
-    else:
-        logger.info(f"ℹ️  OpenWeatherMap API key not found")
-    
+
     # Step 3: 最终降级到模拟数据
-    logger.info(f"📊 All weather APIs failed or unavailable, using mock weather data")
+    if log_info:
+        logger.info("📊 All weather APIs failed or unavailable, using mock weather data")
     return _get_mock_weather_forecast(latitude, longitude, days)
 
 
+def _parse_json(response: requests.Response) -> Any:
+    """Decode a JSON response body, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(response.content)
+    return response.json()
+
+
 def _get_weather_from_google(
     latitude: float, longitude: float, days: int, api_key: str
 ) -> Dict[str, Any]:
@@ -120,6 +233,8 @@ def _get_weather_from_google(
     forecast_list = []
     today = datetime.now().date()
     
+    log_debug = logger.isEnabledFor(logging.DEBUG)
+
     try:
         # Get daily forecast (up to 10 days)
         forecast_url = f"{base_url}/forecast/days:lookup"
@@ -130,27 +245,32 @@ def _get_weather_from_google(
             "days": days,
         }
         
-        logger.debug(f"Requesting weather forecast: {forecast_url} with params: location=({latitude}, {longitude}), days={days}")
-        response = requests.get(forecast_url, params=params, timeout=10)
+        if log_debug:
+            logger.debug(
+                "Requesting weather forecast: %s with params: location=(%s, %s), days=%s",
+                forecast_url, latitude, longitude, days,
+            )
+        response = _SESSION.get(forecast_url, params=params, timeout=10)
         
         if response.status_code == 404:
-            error_data = response.json() if response.text else {}
+            error_data = _parse_json(response) if response.text else {}
             error_msg = error_data.get("error", {}).get("message", response.text)
             
             # Check if it's a location not supported error
             if "not supported for this location" in error_msg.lower() or "try a different location" in error_msg.lower():
-                logger.warning(f"⚠️  Weather API does not support this location ({latitude}, {longitude})")
+                logger.warning("⚠️  Weather API does not support this location (%s, %s)", latitude, longitude)
                 raise requests.exceptions.HTTPError(f"Location not supported: {error_msg}")
             else:
-                logger.error(f"❌ Weather API 404 error. This usually means:")
-                logger.error(f"   1. Weather API is not enabled in your Google Cloud project")
-                logger.error(f"   2. API key doesn't have permission to access Weather API")
-                logger.error(f"   3. Check: https://console.cloud.google.com/google/maps-apis")
+                logger.error("❌ Weather API 404 error. This usually means:")
+                logger.error("   1. Weather API is not enabled in your Google Cloud project")
+                logger.error("   2. API key doesn't have permission to access Weather API")
+                logger.error("   3. Check: https://console.cloud.google.com/google/maps-apis")
                 raise requests.exceptions.HTTPError(f"Weather API not available (404): {error_msg}")
         
         response.raise_for_status()
-        data = response.json()
-        logger.debug(f"Weather API response received successfully")
+        data = _parse_json(response)
+        if log_debug:
+            logger.debug("Weather API response received successfully")
         
         # Process Google Weather API response
         daily_forecast_data = data.get("dailyForecast", {})
@@ -159,7 +279,8 @@ def _get_weather_from_google(
         if not daily_forecasts:
             daily_forecasts = data.get("forecast", {}).get("daily", [])
         
-        logger.debug(f"Received {len(daily_forecasts)} days of forecast data")
+        if log_debug:
+            logger.debug("Received %d days of forecast data", len(daily_forecasts))
         
         # Process each day
         for i in range(days):
@@ -188,11 +309,7 @@ def _get_weather_from_google(
                 precipitation_prob = day_data.get("precipitationProbability", 
                                                   day_data.get("pop", 20))
                 
-                suitable_outdoor = (
-                    "雨" not in condition_cn and 
-                    "雪" not in condition_cn and
-                    precipitation_prob < 50
-                )
+                suitable_outdoor = condition_cn not in _OUTDOOR_UNSUITABLE and precipitation_prob < 50
                 
             else:
                 high_temp = 22
@@ -205,7 +322,7 @@ def _get_weather_from_google(
             
             forecast_list.append(
                 {
-                    "date": forecast_date.strftime("%Y-%m-%d"),
+                    "date": forecast_date.isoformat(),
                     "day_of_week": _get_day_of_week_cn(forecast_date.weekday()),
                     "condition": condition_cn,
                     "condition_icon": _get_weather_icon(condition_cn),
@@ -220,10 +337,10 @@ def _get_weather_from_google(
         return {"status": "success", "forecast": forecast_list}
         
     except requests.exceptions.RequestException as e:
-        logger.error(f"❌ Google Weather API request failed: {e}")
+        logger.error("❌ Google Weather API request failed: %s", e)
         raise
     except KeyError as e:
-        logger.warning(f"⚠️  Unexpected API response structure: {e}, using fallback")
+        logger.warning("⚠️  Unexpected API response structure: %s, using fallback", e)
         raise
 
 
@@ -241,53 +358,59 @@ def _get_weather_from_openweathermap(
         "cnt": days * 8,
     }
     
-    response = requests.get(url, params=params, timeout=10)
+    response = _SESSION.get(url, params=params, timeout=10)
     response.raise_for_status()
-    data = response.json()
+    data = _parse_json(response)
     
     forecast_list = []
     today = datetime.now().date()
+    today_ordinal = today.toordinal()
     
-    daily_forecasts = {}
-    for item in data.get("list", []):
-        dt = datetime.fromtimestamp(item["dt"])
-        date_key = dt.date()
-        
-        if date_key not in daily_forecasts:
-            daily_forecasts[date_key] = {
-                "temps": [],
-                "conditions": [],
-                "humidity": [],
-                "wind_speed": [],
-                "precipitation": [],
-            }
-        
-        daily_forecasts[date_key]["temps"].append(item["main"]["temp"])
-        daily_forecasts[date_key]["conditions"].append(item["weather"][0]["main"])
-        daily_forecasts[date_key]["humidity"].append(item["main"]["humidity"])
-        daily_forecasts[date_key]["wind_speed"].append(
-            item.get("wind", {}).get("speed", 0) * 3.6
-        )
-        rain = item.get("rain", {}).get("3h", 0) if "rain" in item else 0
-        snow = item.get("snow", {}).get("3h", 0) if "snow" in item else 0
-        daily_forecasts[date_key]["precipitation"].append(rain + snow)
+    # Per 3-hour forecast point: day offset from today (local date) and measurements
+    items = data.get("list", [])
+    offsets = [datetime.fromtimestamp(item["dt"]).toordinal() - today_ordinal for item in items]
+    day_index = np.array(offsets, dtype=np.int64)
+    temps = np.array([item["main"]["temp"] for item in items], dtype=float)
+    humidity = np.array([item["main"]["humidity"] for item in items], dtype=float)
+    wind_speed = np.array(
+        [item.get("wind", {}).get("speed", 0) for item in items], dtype=float
+    ) * 3.6
+    precipitation = np.array(
+        [item.get("rain", {}).get("3h", 0) + item.get("snow", {}).get("3h", 0) for item in items],
+        dtype=float,
+    )
+    
+    # Aggregate all days in one vectorized pass
+    in_range = (day_index >= 0) & (day_index < days)
+    day_index = day_index[in_range]
+    temps = temps[in_range]
+    counts = np.bincount(day_index, minlength=days).tolist()
+    humidity_sums = np.bincount(day_index, weights=humidity[in_range], minlength=days).tolist()
+    wind_sums = np.bincount(day_index, weights=wind_speed[in_range], minlength=days).tolist()
+    precip_sums = np.bincount(day_index, weights=precipitation[in_range], minlength=days).tolist()
+    highs = np.full(days, -np.inf)
+    np.maximum.at(highs, day_index, temps)
+    lows = np.full(days, np.inf)
+    np.minimum.at(lows, day_index, temps)
+    highs = highs.tolist()
+    lows = lows.tolist()
+    
+    day_conditions = [[] for _ in range(days)]
+    for item, day in zip(items, offsets):
+        if 0 <= day < days:
+            day_conditions[day].append(item["weather"][0]["main"])
     
     for i in range(days):
         forecast_date = today + timedelta(days=i)
-        date_key = forecast_date
         
-        if date_key in daily_forecasts:
-            day_data = daily_forecasts[date_key]
-            high_temp = max(day_data["temps"])
-            low_temp = min(day_data["temps"])
-            avg_humidity = sum(day_data["humidity"]) / len(day_data["humidity"])
-            avg_wind = sum(day_data["wind_speed"]) / len(day_data["wind_speed"])
-            total_precip = sum(day_data["precipitation"])
+        if counts[i]:
+            high_temp = highs[i]
+            low_temp = lows[i]
+            avg_humidity = humidity_sums[i] / counts[i]
+            avg_wind = wind_sums[i] / counts[i]
+            total_precip = precip_sums[i]
             
-            condition_counts = {}
-            for cond in day_data["conditions"]:
-                condition_counts[cond] = condition_counts.get(cond, 0) + 1
-            main_condition = max(condition_counts, key=condition_counts.get)
+            main_condition = Counter(day_conditions[i]).most_common(1)[0][0]
             
             condition_cn = _map_condition_to_chinese(main_condition)
             precip_prob = min(round(total_precip * 20), 100) if total_precip > 0 else 20
@@ -304,7 +427,7 @@ def _get_weather_from_openweathermap(
         
         forecast_list.append(
             {
-                "date": forecast_date.strftime("%Y-%m-%d"),
+                "date": forecast_date.isoformat(),
                 "day_of_week": _get_day_of_week_cn(forecast_date.weekday()),
                 "condition": condition_cn,
                 "condition_icon": _get_weather_icon(condition_cn),
@@ -333,10 +456,11 @@ def _get_mock_weather_forecast(
         forecast_date = today + timedelta(days=i)
         condition = conditions[i % len(conditions)]
         temp_variation = (i % 3) * 2 - 2
+        outdoor_ok = condition not in _OUTDOOR_UNSUITABLE
 
         forecast_list.append(
             {
-                "date": forecast_date.strftime("%Y-%m-%d"),
+                "date": forecast_date.isoformat(),
                 "day_of_week": _get_day_of_week_cn(forecast_date.weekday()),
                 "condition": condition,
                 "condition_icon": _get_weather_icon(condition),
@@ -346,8 +470,8 @@ def _get_mock_weather_forecast(
                 },
                 "humidity": 60 + (i % 3) * 5,
                 "wind_speed": 8 + (i % 3) * 2,
-                "precipitation_probability": 20 if "雨" not in condition else 70,
-                "suitable_for_outdoor": "雨" not in condition,
+                "precipitation_probability": 20 if outdoor_ok else 70,
+                "suitable_for_outdoor": outdoor_ok,
             }
         )
 
@@ -357,44 +481,12 @@ def _get_mock_weather_forecast(
 def _map_condition_to_chinese(condition: str) -> str:
     """Map English weather condition to Chinese."""
     condition_lower = condition.lower()
-    
-    openweather_map = {
-        "clear": "晴天",
-        "clouds": "多云",
-        "rain": "雨天",
-        "drizzle": "小雨",
-        "thunderstorm": "雷雨",
-        "snow": "雪天",
-        "mist": "雾",
-        "fog": "雾",
-        "haze": "雾",
-    }
-    
-    general_map = {
-        "clear": "晴天",
-        "sunny": "晴天",
-        "partly cloudy": "多云",
-        "cloudy": "多云",
-        "overcast": "阴天",
-        "rain": "雨天",
-        "rainy": "雨天",
-        "drizzle": "小雨",
-        "showers": "阵雨",
-        "thunderstorm": "雷雨",
-        "snow": "雪天",
-        "snowy": "雪天",
-        "mist": "雾",
-        "fog": "雾",
-        "foggy": "雾",
-    }
-    
-    if condition_lower in openweather_map:
-        return openweather_map[condition_lower]
-    
-    if condition_lower in general_map:
-        return general_map[condition_lower]
-    
-    for key, value in {**openweather_map, **general_map}.items():
+    return _ALL_CONDITION_MAP.get(condition_lower) or _fuzzy_condition_lookup(condition_lower)
+
+
+def _fuzzy_condition_lookup(condition_lower: str) -> str:
+    """Map a condition by substring match, defaulting to cloudy."""
+    for key, value in _ALL_CONDITION_ITEMS:
         if key in condition_lower or condition_lower in key:
             return value
     
@@ -403,19 +495,9 @@ def _map_condition_to_chinese(condition: str) -> str:
 
 def _get_day_of_week_cn(weekday: int) -> str:
     """Get Chinese day of week."""
-    days = ["周一", "周二", "周三", "周四", "周五", "周六", "周日"]
-    return days[weekday]
+    return _DAYS_CN[weekday]
 
 
 def _get_weather_icon(condition: str) -> str:
     """Get weather icon emoji."""
-    icon_map = {
-        "晴天": "☀️",
-        "多云": "⛅",
-        "雨天": "🌧️",
-        "小雨": "🌦️",
-        "雷雨": "⛈️",
-        "雪天": "❄️",
-        "雾": "🌫️",
-    }
-    return icon_map.get(condition, "🌤️")
+    return _ICON_MAP.get(condition, "🌤️")